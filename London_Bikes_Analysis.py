@@ -6,117 +6,27 @@ import plotly.graph_objs as go
 import plotly.express as px
 import plotly.figure_factory as ff
 import seaborn as sns
-import scipy.stats as stats
 import datetime as dt
-from scipy.stats import ttest_ind, pearsonr, f_oneway
 from scipy.stats import linregress
 import streamlit as st
+from anomaly_detection import DemandAnomalyDetector
+from aggregates import hypotheses, H_Test_Result, run_statistical_tests, correlation_matrix
+from bike_data import load_data, engineer_features, load_comfort_weights, seasons_map, weather_code_map
+from daily_profiles import cluster_daily_profiles
 
 
-def load_data():
-    df = pd.read_csv('london_bikes.csv')
-    return df
-
-df = load_data()
+df, quarantined_rows, data_quality_report = load_data()
 
 # Set log level to error to suppress warnings
 st.set_option('deprecation.showPyplotGlobalUse', False)
 st.set_option('deprecation.showfileUploaderEncoding', False)
 
-# Feature Engineering
-# Converting the timestamp to a datetime object
-df['timestamp'] = pd.to_datetime(df['timestamp'])
-
-# Extracting the day, month, and year from the timestamp
-df['day_of_week'] = df['timestamp'].dt.dayofweek + 1
-df['month'] = df['timestamp'].dt.month
-df['year'] = df['timestamp'].dt.year
-df['hour'] = df['timestamp'].dt.hour
-
-# Mapping the day_of_week column
-days_of_week_map = {
-    1: "Monday",
-    2: "Tuesday",
-    3: "Wednesday",
-    4: "Thursday",
-    5: "Friday",
-    6: "Saturday",
-    7: "Sunday"
-}
-df['day_of_week'] = df['day_of_week'].map(days_of_week_map)
-
-# Mapping the season column
-seasons_map = {
-    0: "spring",
-    1: "summer",
-    2: "Autumn",
-    3: "winter"
-}
-df['season_name'] = df['season'].map(seasons_map)
-
-# Mapping the weather_code column
-weather_code_map = {
-    1: "Clear",
-    2: "Few Clouds",
-    3: "Broken Clouds",
-    4: "Cloudy",
-    7: "Light rain",
-    10: "rain with thunderstorm",
-    26: "snowfall",
-    94: "Freezing Fog"
-}
-df['weather_description'] = df['weather_code'].map(weather_code_map)
-
-# Renaming the specified columns
-df.rename(columns={
-    "cnt": "count_of_new_bike_shares",
-    "t1": "real_temperature_C",
-    "t2": "feels_like_temperature_C",
-    "hum": "humidity_percentage"
-}, inplace=True)
-
-# Mapping month numbers to month names
-month_map = {
-    1: "January",
-    2: "February",
-    3: "March",
-    4: "April",
-    5: "May",
-    6: "June",
-    7: "July",
-    8: "August",
-    9: "September",
-    10: "October",
-    11: "November",
-    12: "December"
-}
-df['month_name'] = df['month'].map(month_map)
-
-# Creating a new feature that combines holidays and weekends
-df['day_type'] = np.where(df['is_holiday'] == 1, 'Holiday', 
-                          np.where(df['is_weekend'] == 1, 'Weekend', 'Working Day'))
-df['day_type'].value_counts()
-
-# Calculating comfort_index
-# Normalizing the temperature and humidity values between 0 and 1
-df['normalized_temperature'] = (df['feels_like_temperature_C'] - df['feels_like_temperature_C'].min()) / \
-                              (df['feels_like_temperature_C'].max() - df['feels_like_temperature_C'].min())
-df['normalized_humidity'] = df['humidity_percentage'] / 100.0
-# Normalizing the wind speed values between 0 and 1
-df['normalized_wind_speed'] = (df['wind_speed'] - df['wind_speed'].min()) / \
-                             (df['wind_speed'].max() - df['wind_speed'].min())
-
-# Adjusting the weights for temperature, humidity, and wind speed
-w1 = 0.8  # weight for temperature
-w2 = 0.3  # weight for humidity
-w3 = 0.1  # weight for wind speed
-
-df['comfort_index'] = w1 * df['normalized_temperature'] + w2 * df['normalized_humidity'] + w3 * df['normalized_wind_speed']
-# Dropping the intermediate normalized columns
-df.drop(columns=['normalized_temperature', 'normalized_humidity', 'normalized_wind_speed'], inplace=True)
-# Updating the weather_severity based on the specified conditions
-severe_weather_conditions = ["snowfall", "Freezing Fog", "rain with thunderstorm"]
-df['weather_severity'] = df['weather_description'].apply(lambda x: 1 if x in severe_weather_conditions else 0)
+# Feature Engineering: calendar features, labels, comfort_index and weather_severity
+df = engineer_features(df)
+
+# Clustering the daily hourly-demand profiles into usage archetypes (commute-peaked, leisure-afternoon, ...)
+daily_archetypes, archetype_profiles = cluster_daily_profiles(df)
+df['day_archetype'] = df['timestamp'].dt.normalize().map(daily_archetypes.set_index('date')['day_archetype'])
 
 weather_colors = {
     "Clear": "rgb(58, 200, 225)",
@@ -174,7 +84,9 @@ analysis_types = [
     "6. Seasonal and Weather Severity Analysis",
     "7. Statistical Analysis: ANOVA test, T-test and Pearson's Correlation",
     "8. A/B Testing Visualizations",
-    "9. Conclusion"
+    "9. Demand Anomaly Detection",
+    "10. Daily Usage Archetypes",
+    "11. Conclusion"
 ]
 
 st.image('Bikes.png', caption='Bikes_Sharing', use_column_width=True)
@@ -246,12 +158,21 @@ if selected_analysis == "1. Introduction":
                 
     """)
 
+    st.markdown("""
+    ### Data Quality
+    Every row is checked at load time for unknown weather codes or seasons, duplicate or missing hourly timestamps, negative bike share counts, humidity outside 0-100% and missing values. Rows that break a rule are quarantined and left out of all the analyses.
+    """)
+    st.dataframe(data_quality_report)
+    if len(quarantined_rows) > 0:
+        st.write(f"- **{len(quarantined_rows)}** rows were quarantined:")
+        st.dataframe(quarantined_rows)
+
 
 elif selected_analysis == "2. Correlation Analysis":
 # Heatmap for correlation
-    correlation_matrix = df.corr()
+    correlation = correlation_matrix(df)
     plt.figure(figsize=(16, 8))
-    sns.heatmap(correlation_matrix, annot=True, cmap='coolwarm')
+    sns.heatmap(correlation, annot=True, cmap='coolwarm')
     plt.title('Heatmap for Correlation Between Numerical Variables')
     st.pyplot()
     st.write("""
@@ -489,6 +410,19 @@ elif selected_analysis == "6. Seasonal and Weather Severity Analysis":
                                                    title='Scatter Plot: Comfort Index vs. Count of New Bike Shares')
 
     st.plotly_chart(scatter_season_with_overall_regression)
+
+    # Weights of the normalized temperature, humidity and wind speed (calibrated by comfort_calibration.py when it has been run)
+    w1, w2, w3 = load_comfort_weights()
+    comfort_factors = {'feels-like temperature': w1, 'humidity': w2, 'wind speed': w3}
+    raising = [factor for factor, weight in comfort_factors.items() if weight > 0]
+    dropped = [factor for factor, weight in comfort_factors.items() if weight == 0]
+    comfort_weights_text = f"- Comfort index weights in use: feels-like temperature **{w1}**, humidity **{w2}**, wind speed **{w3}**. "
+    raising_text = ', '.join(raising[:-1]) + ' and ' + raising[-1] if len(raising) > 1 else raising[0]
+    comfort_weights_text += f"The index counts higher {raising_text} as more comfortable"
+    comfort_weights_text += f", and leaves out {' and '.join(dropped)}. " if dropped else ". "
+    if w3 > 0:
+        comfort_weights_text += "This means windier hours get a higher comfort index, even though wind usually makes cycling less pleasant. The index follows the weather that goes with more rides, not how pleasant the weather feels."
+    st.write(comfort_weights_text)
     st.write("""- The scatter plot displays the relationship between the comfort_index and the count_of_new_bike_shares. As the comfort index increases, we can observe an increase in the number of bike shares, suggesting that people tend to use bikes more when the weather is comfortable.\n -Comfort Index Business Insight:
     - **The Comfort Index**, derived from temperature, humidity and wind speed, plays a pivotal role in influencing bike-sharing behaviors. When the Comfort Index is high, implying optimal temperature and humidity levels, there's a noticeable surge in bike rentals. Conversely, a lower Comfort Index, indicating either too hot, too cold, or too humid conditions, leads to a reduced demand. For bike-sharing businesses, understanding this index can be instrumental in forecasting demand, optimizing inventory, and enhancing customer experiences. By aligning promotional activities, maintenance schedules, and inventory planning with the Comfort Index predictions, businesses can maximize profitability and customer satisfaction.
              """)
@@ -594,45 +528,8 @@ elif selected_analysis == "6. Seasonal and Weather Severity Analysis":
 
 elif selected_analysis == "7. Statistical Analysis: ANOVA test, T-test and Pearson's Correlation":
     st.write("""- We will now run the Statistical tests for the count_of_new_bike_shares across different seasons, comfort index, holiday, and weekend.""")
-    # Define a function to yield result on the basis of given significance value - 0.05.
-    def H_Test_Result(p_value):
-            significance_level = 0.05
-            if p_value <= significance_level: 
-                return 'Reject NULL HYPOTHESIS'
-            else: 
-                return 'Fail to Reject NULL HYPOTHESIS'
-
-    # Define hypotheses for each test
-    hypotheses = {
-        "Season vs. Bike Shares": {
-            "H0": "The mean bike shares are the same across all seasons.",
-            "H1": "At least one season has a different mean of bike shares compared to the others."
-        },
-        "Comfort Index vs. Bike Shares": {
-            "H0": "There is no linear correlation between the comfort index and the number of bike shares.",
-            "H1": "There is a linear correlation between the comfort index and the number of bike shares."
-        },
-        "Holiday vs. Bike Shares": {
-            "H0": "The mean bike shares are the same on holidays and non-holidays.",
-            "H1": "The mean bike shares on holidays is different from that on non-holidays."
-        },
-        "Weekend vs. Bike Shares": {
-            "H0": "The mean bike shares are the same on weekends and weekdays.",
-            "H1": "The mean bike shares on weekends is different from that on weekdays."
-        }
-    }
-
-    # Running the tests and storing results
-    test_results = {
-        "Season vs. Bike Shares": stats.f_oneway(df['count_of_new_bike_shares'][df['season_name'] == 'spring'],
-                                                df['count_of_new_bike_shares'][df['season_name'] == 'summer'],
-                                                df['count_of_new_bike_shares'][df['season_name'] == 'Autumn'],
-                                                df['count_of_new_bike_shares'][df['season_name'] == 'winter']),
-        "Comfort Index vs. Bike Shares": pearsonr(df["comfort_index"], df["count_of_new_bike_shares"]),
-        "Holiday vs. Bike Shares": ttest_ind(df["count_of_new_bike_shares"][df["is_holiday"] == 1], df["count_of_new_bike_shares"][df["is_holiday"] == 0]),
-        "Weekend vs. Bike Shares": ttest_ind(df["count_of_new_bike_shares"][df["is_weekend"] == 1], df["count_of_new_bike_shares"][df["is_weekend"] == 0])
-        
-    }
+    # Running the tests and storing results (hypotheses and H_Test_Result are shared with the aggregate API)
+    test_results = run_statistical_tests(df)
 
     # Formatting the hypothesis test results
     for test_name, results in test_results.items():
@@ -725,7 +622,79 @@ elif selected_analysis == "8. A/B Testing Visualizations":
     - **Snowfall:** Snowy conditions result in reduced bike shares, but the median is still higher than during thunderstorms.
     """)
 
-elif selected_analysis == "9. Conclusion":
+elif selected_analysis == "9. Demand Anomaly Detection":
+    st.title("Demand Anomaly Detection")
+    st.write("""- Each hour is compared with the typical demand of its context: the same hour of the day, day type, season and weather condition. The baseline of every context is its median and median absolute deviation (MAD), and the anomaly score is a robust z-score. Hours scoring beyond the threshold are flagged as possible outages or events.""")
+
+    anomaly_threshold = st.slider("Anomaly score threshold", min_value=2.0, max_value=8.0, value=3.5, step=0.5)
+
+    # Fitting the per-context baselines and backfilling the scores over the whole history
+    detector = DemandAnomalyDetector(seasons=list(seasons_map.values()), weathers=list(weather_code_map.values()),
+                                     threshold=anomaly_threshold)
+    detector.fit(df)
+    df_scored = detector.backfill(df)
+    anomalies = df_scored[df_scored['is_anomaly']]
+
+    st.write(f"- **{len(anomalies)}** of {len(df_scored)} hours are flagged as anomalies "
+             f"({(anomalies['anomaly_score'] < 0).sum()} demand drops, {(anomalies['anomaly_score'] > 0).sum()} demand spikes).")
+
+    # Timeline of bike shares with the flagged hours highlighted
+    timeline_anomalies = px.line(df_scored, x='timestamp', y='count_of_new_bike_shares', title='Hourly Bike Shares with Flagged Anomalies')
+    timeline_anomalies.add_trace(go.Scatter(x=anomalies['timestamp'], y=anomalies['count_of_new_bike_shares'], mode='markers',
+                                            marker=dict(color='red', size=6), name='Anomaly'))
+    st.plotly_chart(timeline_anomalies)
+
+    # Listing the anomalies, strongest deviations first
+    st.subheader("Flagged Hours")
+    anomaly_table = anomalies.reindex(anomalies['anomaly_score'].abs().sort_values(ascending=False).index)
+    st.dataframe(anomaly_table[['timestamp', 'day_type', 'season_name', 'weather_description',
+                                'count_of_new_bike_shares', 'expected_bike_shares', 'anomaly_score']])
+
+    # Number of anomalies per context
+    anomalies_by_context = anomalies.groupby(['day_type', 'weather_description']).size().reset_index(name='anomalies')
+    bar_anomalies = px.bar(anomalies_by_context, x='weather_description', y='anomalies', color='day_type',
+                           title='Flagged Hours by Weather Condition and Day Type')
+    st.plotly_chart(bar_anomalies)
+    st.write("""
+    **Insights:**
+    - **Demand drops** that are not explained by the hour, day type, season or weather usually point to disruptions such as station outages, strikes or the Christmas holiday period.
+    - **Demand spikes** highlight events (concerts, sports, tube strikes) that push people towards bike sharing.
+    - Monitoring these hours helps operations react quickly to outages and plan rebalancing around recurring events.
+    """)
+
+elif selected_analysis == "10. Daily Usage Archetypes":
+    st.title("Daily Usage Archetypes")
+    st.write("""- Instead of labelling fixed hours as commute hours, every day is turned into a 24-hour demand profile and similar days are grouped together with k-means clustering. Each group is an archetype of how London uses the bikes over a day.""")
+
+    # Average hourly profile of each archetype
+    archetype_lines = archetype_profiles.melt(id_vars=['day_archetype', 'days'], var_name='hour', value_name='count_of_new_bike_shares')
+    line_archetypes = px.line(archetype_lines, x='hour', y='count_of_new_bike_shares', color='day_archetype', markers=True,
+                              title='Average Hourly Bike Shares per Daily Usage Archetype', hover_data=['days'])
+    line_archetypes.update_xaxes(tickvals=list(range(0, 24)))
+    st.plotly_chart(line_archetypes)
+
+    # Number of days of each archetype per day type and season
+    archetype_days = df.assign(date=df['timestamp'].dt.normalize()).drop_duplicates('date')
+    bar_archetype_day_type = px.histogram(archetype_days, x='day_type', color='day_archetype', barmode='stack',
+                                          title='Number of Days per Archetype and Day Type')
+    st.plotly_chart(bar_archetype_day_type)
+    bar_archetype_season = px.histogram(archetype_days, x='season_name', color='day_archetype', barmode='stack',
+                                        title='Number of Days per Archetype and Season')
+    st.plotly_chart(bar_archetype_season)
+
+    # Calendar view of the archetypes
+    scatter_archetypes = px.scatter(daily_archetypes, x='date', y='daily_bike_shares', color='day_archetype',
+                                    title='Daily Bike Shares Coloured by Usage Archetype')
+    st.plotly_chart(scatter_archetypes)
+    st.write("""
+    **Insights:**
+    - **Commute-peaked** days show the two rush-hour peaks around 8 AM and 5-6 PM and are almost exclusively working days. The high and low demand variants mainly differ by season.
+    - **Leisure-afternoon** days have a single broad peak in the early afternoon and are almost all weekends and holidays. The high demand variant is mostly summer and spring days, while the low demand variant is mostly winter and spring days.
+    - The archetype names only describe the shape and volume of the demand, not its cause. Weather is part of the picture but not the whole of it: about a fifth of the hours of low demand days are rainy, which is close to the low demand commute days and well above the high demand days of either shape, and those days are colder too.
+    - The archetype of each day is stored in the `day_archetype` column, so it can be used to segment the other analyses beyond a fixed list of commute hours.
+    """)
+
+elif selected_analysis == "11. Conclusion":
     st.title("Business Insight for Developing the Bike Sharing System")
     
     st.write("""
@@ -753,4 +722,4 @@ elif selected_analysis == "9. Conclusion":
     - **User Experience:** Regularly maintain bikes to ensure a comfortable experience. Consider user feedback to introduce new features or improvements.
 
     By understanding and acting upon these patterns, the bike-sharing system in London can ensure better service, increase user satisfaction, and boost overall usage, contributing to a greener and more sustainable urban transport solution.
-    """)
\ No newline at end of file
+    """)
\ No newline at end of file
@@ -0,0 +1,235 @@
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import os
+import sys
+import traceback
+from urllib.parse import urlsplit, parse_qs
+
+from aggregates import hypotheses, H_Test_Result, run_statistical_tests, correlation_matrix, bike_share_aggregates
+from bike_data import DATA_FILE, WEIGHTS_FILE, load_data, engineer_features
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+JSON_TYPE = 'application/json'
+ARROW_TYPE = 'application/vnd.apache.arrow.stream'
+
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               406: 'Not Acceptable', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def data_version(path=DATA_FILE, weights_path=WEIGHTS_FILE):
+    """Identifies the data the aggregates are computed from by the size and mtime of its inputs."""
+    signature = []
+    for input_path in (path, weights_path):
+        if os.path.exists(input_path):
+            stat = os.stat(input_path)
+            signature.append(f"{input_path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1('|'.join(signature).encode()).hexdigest()[:16]
+
+
+def compute_tables(path=DATA_FILE):
+    """Computes every table served by the API from the engineered data."""
+    df, _, data_quality_report = load_data(path)
+    df = engineer_features(df)
+
+    test_results = run_statistical_tests(df)
+    tests = []
+    for test_name, results in test_results.items():
+        tests.append({
+            'test': test_name,
+            'H0': hypotheses[test_name]['H0'],
+            'H1': hypotheses[test_name]['H1'],
+            'statistic': float(results[0]),
+            'p_value': float(results[1]),
+            'conclusion': H_Test_Result(results[1])
+        })
+
+    correlation = correlation_matrix(df)
+    return {
+        '/aggregates/hourly': bike_share_aggregates(df, 'hour'),
+        '/aggregates/day_type': bike_share_aggregates(df, 'day_type'),
+        '/aggregates/season': bike_share_aggregates(df, 'season_name'),
+        '/aggregates/hourly_day_type': bike_share_aggregates(df, ['hour', 'day_type']),
+        '/statistical_tests': tests,
+        '/correlation': correlation.reset_index().rename(columns={'index': 'variable'}),
+        '/data_quality': data_quality_report
+    }
+
+
+class ResponseCache:
+    """Holds the encoded responses of the current data version.
+
+    Tables are computed once per data version; JSON bodies are encoded up front and Arrow
+    bodies on first request. A lock makes concurrent requests after a data change wait for a
+    single recomputation instead of each starting their own. When a version fails to load (the
+    CSV is missing or half written), the last good version keeps being served and the failed
+    version is not retried until the inputs change again.
+    """
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.version = None
+        self.tables = {}
+        self.bodies = {}
+        self.failed_version = None
+        self.last_error = None
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        version = data_version(self.path)
+        if version in (self.version, self.failed_version):
+            return
+        async with self._lock:
+            if version in (self.version, self.failed_version):
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                tables = await loop.run_in_executor(None, compute_tables, self.path)
+            except Exception as e:
+                self.failed_version = version
+                self.last_error = f"{type(e).__name__}: {e}"
+                serving = f"serving version {self.version}" if self.version else "answering 503 until it loads"
+                print(f"Could not load data version {version} ({self.last_error}); {serving}", file=sys.stderr)
+                return
+            self.tables, self.version, self.failed_version = tables, version, None
+            self.bodies = {(route, JSON_TYPE): self._encode_json(table) for route, table in tables.items()}
+
+    def get(self, route, content_type):
+        """Returns (body, etag) for a route, or None when the route or format is unavailable."""
+        if route not in self.tables:
+            return None
+        key = (route, content_type)
+        if key not in self.bodies:
+            table = self.tables[route]
+            if content_type != ARROW_TYPE or pa is None or isinstance(table, list):
+                return None
+            self.bodies[key] = self._encode_arrow(table)
+        return self.bodies[key]
+
+    def _encode_json(self, table):
+        records = table if isinstance(table, list) else json.loads(table.to_json(orient='records'))
+        body = json.dumps({'version': self.version, 'data': records}).encode()
+        return body, self._etag(body)
+
+    def _encode_arrow(self, table):
+        sink = io.BytesIO()
+        arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+        with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+        body = sink.getvalue()
+        return body, self._etag(body)
+
+    def _etag(self, body):
+        return f'"{self.version}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def response(status, body=b'', content_type=JSON_TYPE, etag=None, keep_alive=True):
+    headers = [
+        f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}"
+    ]
+    if body:
+        headers.append(f"Content-Type: {content_type}")
+    if etag:
+        headers.append(f"ETag: {etag}")
+        headers.append("Cache-Control: no-cache")
+    return ('\r\n'.join(headers) + '\r\n\r\n').encode() + body
+
+
+def error(status, message, keep_alive=True):
+    return response(status, json.dumps({'error': message}).encode(), keep_alive=keep_alive)
+
+
+async def handle_request(cache, method, target, headers):
+    if method != 'GET':
+        return error(405, 'only GET is supported')
+    url = urlsplit(target)
+    await cache.refresh()
+    if cache.version is None:
+        return error(503, f"no data version could be loaded: {cache.last_error}")
+
+    if url.path == '/':
+        routes = sorted(cache.tables)
+        return response(200, json.dumps({'version': cache.version, 'routes': routes}).encode())
+
+    # Arrow is returned for ?format=arrow or an Arrow Accept header, JSON otherwise
+    arrow = parse_qs(url.query).get('format') == ['arrow'] or ARROW_TYPE in headers.get('accept', '')
+    content_type = ARROW_TYPE if arrow else JSON_TYPE
+    if url.path not in cache.tables:
+        return error(404, f"unknown route {url.path}")
+    cached = cache.get(url.path, content_type)
+    if cached is None:
+        return error(406, 'Arrow output needs pyarrow and a tabular route')
+
+    body, etag = cached
+    if etag in headers.get('if-none-match', ''):
+        return response(304, etag=etag)
+    return response(200, body, content_type, etag)
+
+
+async def serve_connection(cache, reader, writer):
+    # Serving requests on the connection until the client closes it (HTTP/1.1 keep-alive)
+    try:
+        while True:
+            try:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+            except ValueError:
+                # Request line or header longer than the stream limit
+                writer.write(error(400, 'request too long', keep_alive=False))
+                break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                writer.write(error(400, 'malformed request line', keep_alive=False))
+                break
+            method, target, _ = parts
+
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            try:
+                writer.write(await handle_request(cache, method, target, headers))
+            except Exception:
+                traceback.print_exc()
+                writer.write(error(500, 'internal error'))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host, port, path):
+    cache = ResponseCache(path)
+    await cache.refresh()
+    server = await asyncio.start_server(lambda r, w: serve_connection(cache, r, w), host, port)
+    loaded = f"version {cache.version}" if cache.version else "no data loaded yet"
+    print(f"Serving bike share aggregates ({loaded}) on http://{host}:{port}/")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Read-only HTTP service for the bike share aggregates.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--data', default=DATA_FILE, help='raw hourly bike shares CSV')
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.data))
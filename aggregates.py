@@ -0,0 +1,59 @@
+import scipy.stats as stats
+from scipy.stats import ttest_ind, pearsonr
+
+
+# Hypotheses for each statistical test
+hypotheses = {
+    "Season vs. Bike Shares": {
+        "H0": "The mean bike shares are the same across all seasons.",
+        "H1": "At least one season has a different mean of bike shares compared to the others."
+    },
+    "Comfort Index vs. Bike Shares": {
+        "H0": "There is no linear correlation between the comfort index and the number of bike shares.",
+        "H1": "There is a linear correlation between the comfort index and the number of bike shares."
+    },
+    "Holiday vs. Bike Shares": {
+        "H0": "The mean bike shares are the same on holidays and non-holidays.",
+        "H1": "The mean bike shares on holidays is different from that on non-holidays."
+    },
+    "Weekend vs. Bike Shares": {
+        "H0": "The mean bike shares are the same on weekends and weekdays.",
+        "H1": "The mean bike shares on weekends is different from that on weekdays."
+    }
+}
+
+
+# Define a function to yield result on the basis of given significance value - 0.05.
+def H_Test_Result(p_value):
+    significance_level = 0.05
+    if p_value <= significance_level:
+        return 'Reject NULL HYPOTHESIS'
+    else:
+        return 'Fail to Reject NULL HYPOTHESIS'
+
+
+def run_statistical_tests(df):
+    """Runs the ANOVA, Pearson and t-tests of the statistical analysis on the engineered data."""
+    return {
+        "Season vs. Bike Shares": stats.f_oneway(df['count_of_new_bike_shares'][df['season_name'] == 'spring'],
+                                                df['count_of_new_bike_shares'][df['season_name'] == 'summer'],
+                                                df['count_of_new_bike_shares'][df['season_name'] == 'Autumn'],
+                                                df['count_of_new_bike_shares'][df['season_name'] == 'winter']),
+        "Comfort Index vs. Bike Shares": pearsonr(df["comfort_index"], df["count_of_new_bike_shares"]),
+        "Holiday vs. Bike Shares": ttest_ind(df["count_of_new_bike_shares"][df["is_holiday"] == 1], df["count_of_new_bike_shares"][df["is_holiday"] == 0]),
+        "Weekend vs. Bike Shares": ttest_ind(df["count_of_new_bike_shares"][df["is_weekend"] == 1], df["count_of_new_bike_shares"][df["is_weekend"] == 0])
+    }
+
+
+def correlation_matrix(df):
+    """Returns the correlation between the numerical variables."""
+    return df.corr(numeric_only=True)
+
+
+def bike_share_aggregates(df, by):
+    """Returns the mean, total and number of hours of bike shares for each value of the by column(s)."""
+    return df.groupby(by)['count_of_new_bike_shares'].agg(
+        mean_bike_shares='mean',
+        total_bike_shares='sum',
+        hours='size'
+    ).reset_index()
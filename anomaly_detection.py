@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+
+from bike_data import day_types
+
+
+# Scaling constant that makes the MAD comparable to a standard deviation
+MAD_SCALE = 0.6745
+
+
+class DemandAnomalyDetector:
+    """Flags hours whose bike shares deviate from the expected demand of their context.
+
+    The context of a row is (hour, day_type, season_name, weather_description). For every
+    context the detector keeps a robust baseline (median and MAD) in a dense numpy array,
+    so scoring a new row is a constant-time lookup. Contexts with fewer than min_count rows
+    of history fall back to the (hour, day_type) baseline, and a row is not scored (NaN)
+    while that baseline is still too thin as well.
+    """
+
+    def __init__(self, seasons, weathers, threshold=3.5, min_count=5, learning_rate=0.05):
+        self.seasons = list(seasons)
+        self.weathers = list(weathers)
+        self.threshold = threshold
+        self.min_count = min_count
+        self.learning_rate = learning_rate
+
+        # Lookup tables from category label to array index
+        self._day_type_index = {name: i for i, name in enumerate(day_types)}
+        self._season_index = {name: i for i, name in enumerate(self.seasons)}
+        self._weather_index = {name: i for i, name in enumerate(self.weathers)}
+
+        shape = (24, len(day_types), len(self.seasons), len(self.weathers))
+        self.median = np.full(shape, np.nan)
+        self.mad = np.full(shape, np.nan)
+        self.count = np.zeros(shape, dtype=np.int64)
+
+        # Coarse (hour, day_type) baseline used for sparse contexts
+        self.coarse_median = np.full(shape[:2], np.nan)
+        self.coarse_mad = np.full(shape[:2], np.nan)
+        self.coarse_count = np.zeros(shape[:2], dtype=np.int64)
+
+    def _context_codes(self, df):
+        # Vectorized translation of the context columns into array indices (-1 = unknown)
+        hour = df['hour'].to_numpy(dtype=np.int64)
+        day_type = df['day_type'].map(self._day_type_index).fillna(-1).to_numpy(dtype=np.int64)
+        season = df['season_name'].map(self._season_index).fillna(-1).to_numpy(dtype=np.int64)
+        weather = df['weather_description'].map(self._weather_index).fillna(-1).to_numpy(dtype=np.int64)
+        known = (hour >= 0) & (hour < 24) & (day_type >= 0) & (season >= 0) & (weather >= 0)
+        return hour, day_type, season, weather, known
+
+    def fit(self, df):
+        """Computes the exact per-context baselines from a history of engineered rows."""
+        hour, day_type, season, weather, known = self._context_codes(df)
+        history = pd.DataFrame({
+            'hour': hour[known],
+            'day_type': day_type[known],
+            'season': season[known],
+            'weather': weather[known],
+            'count': df['count_of_new_bike_shares'].to_numpy(dtype=float)[known]
+        })
+
+        for keys, median, mad, count in ((['hour', 'day_type'], self.coarse_median, self.coarse_mad, self.coarse_count),
+                                         (['hour', 'day_type', 'season', 'weather'], self.median, self.mad, self.count)):
+            group_median = history.groupby(keys)['count'].transform('median')
+            history['deviation'] = (history['count'] - group_median).abs()
+            baseline = history.groupby(keys).agg(
+                median=('count', 'median'),
+                mad=('deviation', 'median'),
+                count=('count', 'size')
+            )
+            cells = tuple(baseline.index.get_level_values(level).to_numpy() for level in keys)
+            median[...] = np.nan
+            mad[...] = np.nan
+            count[...] = 0
+            median[cells] = baseline['median'].to_numpy()
+            # A zero MAD would turn every deviation into an infinite score
+            mad[cells] = np.maximum(baseline['mad'].to_numpy(), 1.0)
+            count[cells] = baseline['count'].to_numpy()
+        return self
+
+    def score(self, hour, day_type, season_name, weather_description, count):
+        """Returns the robust z-score of a single observation.
+
+        NaN for an unknown context or a context without min_count rows of history.
+        """
+        cell = self._cell(hour, day_type, season_name, weather_description)
+        if cell is None:
+            return np.nan
+        if self.count[cell] >= self.min_count:
+            median, mad = self.median[cell], self.mad[cell]
+        elif self.coarse_count[cell[:2]] >= self.min_count:
+            median, mad = self.coarse_median[cell[:2]], self.coarse_mad[cell[:2]]
+        else:
+            return np.nan
+        return MAD_SCALE * (count - median) / mad
+
+    def update(self, hour, day_type, season_name, weather_description, count):
+        """Moves the baselines of the row's context towards the new observation.
+
+        Each update is O(1). While a cell has fewer than min_count rows, its baseline is a running
+        mean and mean absolute deviation, with the MAD of a new context starting from the
+        (hour, day_type) one. After that it is a frugal streaming estimate of the median and MAD,
+        so a single outlier can only shift the baseline by a bounded step.
+        """
+        cell = self._cell(hour, day_type, season_name, weather_description)
+        if cell is None:
+            return
+        coarse = cell[:2]
+        start_mad = self.coarse_mad[coarse]
+        self._update_cell(self.median, self.mad, self.count, cell, count, start_mad)
+        self._update_cell(self.coarse_median, self.coarse_mad, self.coarse_count, coarse, count, np.nan)
+
+    def _update_cell(self, median, mad, counts, cell, value, start_mad):
+        n = counts[cell] + 1
+        counts[cell] = n
+        if n == 1:
+            median[cell] = value
+            mad[cell] = start_mad if not np.isnan(start_mad) else 0.0
+        elif n <= self.min_count:
+            deviation = abs(value - median[cell])
+            median[cell] += (value - median[cell]) / n
+            mad[cell] += (deviation - mad[cell]) / n
+        else:
+            step = self.learning_rate * mad[cell]
+            deviation = abs(value - median[cell])
+            median[cell] += step * np.sign(value - median[cell])
+            mad[cell] += step * np.sign(deviation - mad[cell])
+        mad[cell] = max(mad[cell], 1.0)
+
+    def process(self, hour, day_type, season_name, weather_description, count):
+        """Scores a new row from the stream and then folds it into the baseline."""
+        z = self.score(hour, day_type, season_name, weather_description, count)
+        self.update(hour, day_type, season_name, weather_description, count)
+        return z, bool(abs(z) >= self.threshold)
+
+    def backfill(self, df):
+        """Scores a whole history in one vectorized pass.
+
+        Returns a copy of df with the 'expected_bike_shares' baseline, an 'anomaly_score' column
+        (robust z-score, NaN for rows with an unknown or too sparse context) and a boolean
+        'is_anomaly' column.
+        """
+        hour, day_type, season, weather, known = self._context_codes(df)
+        cells = (hour[known], day_type[known], season[known], weather[known])
+        coarse = cells[:2]
+        fine_ready = self.count[cells] >= self.min_count
+        coarse_ready = self.coarse_count[coarse] >= self.min_count
+        median = np.where(fine_ready, self.median[cells], np.where(coarse_ready, self.coarse_median[coarse], np.nan))
+        mad = np.where(fine_ready, self.mad[cells], np.where(coarse_ready, self.coarse_mad[coarse], np.nan))
+
+        expected = np.full(len(df), np.nan)
+        expected[known] = median
+        scores = np.full(len(df), np.nan)
+        counts = df['count_of_new_bike_shares'].to_numpy(dtype=float)[known]
+        scores[known] = MAD_SCALE * (counts - median) / mad
+
+        result = df.copy()
+        result['expected_bike_shares'] = expected
+        result['anomaly_score'] = scores
+        result['is_anomaly'] = np.abs(np.nan_to_num(scores)) >= self.threshold
+        return result
+
+    def _cell(self, hour, day_type, season_name, weather_description):
+        d = self._day_type_index.get(day_type)
+        s = self._season_index.get(season_name)
+        w = self._weather_index.get(weather_description)
+        if d is None or s is None or w is None or not 0 <= hour < 24:
+            return None
+        return (int(hour), d, s, w)
@@ -0,0 +1,134 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_validation import load_validated_csv
+
+
+DATA_FILE = 'london_bikes.csv'
+WEIGHTS_FILE = 'comfort_weights.json'
+
+# Hand-picked comfort_index weights used until a calibration has been written
+DEFAULT_WEIGHTS = (0.8, 0.3, 0.1)
+
+# Labels of the season and weather_code columns, also used to validate the raw data
+seasons_map = {
+    0: "spring",
+    1: "summer",
+    2: "Autumn",
+    3: "winter"
+}
+
+weather_code_map = {
+    1: "Clear",
+    2: "Few Clouds",
+    3: "Broken Clouds",
+    4: "Cloudy",
+    7: "Light rain",
+    10: "rain with thunderstorm",
+    26: "snowfall",
+    94: "Freezing Fog"
+}
+
+days_of_week_map = {
+    1: "Monday",
+    2: "Tuesday",
+    3: "Wednesday",
+    4: "Thursday",
+    5: "Friday",
+    6: "Saturday",
+    7: "Sunday"
+}
+
+month_map = {
+    1: "January",
+    2: "February",
+    3: "March",
+    4: "April",
+    5: "May",
+    6: "June",
+    7: "July",
+    8: "August",
+    9: "September",
+    10: "October",
+    11: "November",
+    12: "December"
+}
+
+# Values of the day_type feature (the order is the index used by the anomaly detector)
+day_types = ["Working Day", "Weekend", "Holiday"]
+
+severe_weather_conditions = ["snowfall", "Freezing Fog", "rain with thunderstorm"]
+
+
+def load_data(path=DATA_FILE):
+    # Validating the raw rows at ingest and quarantining the ones that break the data-quality rules
+    df, quarantined, validator = load_validated_csv(path, weather_codes=weather_code_map.keys(),
+                                                    seasons=seasons_map.keys())
+    return df, quarantined, validator.summary()
+
+
+def load_comfort_weights(path=WEIGHTS_FILE):
+    """Returns the (w1, w2, w3) comfort_index weights, falling back to the defaults."""
+    if not os.path.exists(path):
+        return DEFAULT_WEIGHTS
+    with open(path) as f:
+        weights = json.load(f)['weights']
+    return weights['w1'], weights['w2'], weights['w3']
+
+
+def comfort_features(df):
+    """Builds the (n, 3) matrix of normalized feels-like temperature, humidity and wind speed."""
+    temperature = df['feels_like_temperature_C'].to_numpy(dtype=float)
+    wind_speed = df['wind_speed'].to_numpy(dtype=float)
+    return np.column_stack([
+        # Normalizing the temperature and wind speed values between 0 and 1
+        (temperature - temperature.min()) / (temperature.max() - temperature.min()),
+        df['humidity_percentage'].to_numpy(dtype=float) / 100.0,
+        (wind_speed - wind_speed.min()) / (wind_speed.max() - wind_speed.min())
+    ])
+
+
+def engineer_features(df):
+    """Adds the calendar, label and comfort_index features used by every analysis."""
+    # Converting the timestamp to a datetime object
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+
+    # Extracting the day, month, and year from the timestamp
+    df['day_of_week'] = df['timestamp'].dt.dayofweek + 1
+    df['month'] = df['timestamp'].dt.month
+    df['year'] = df['timestamp'].dt.year
+    df['hour'] = df['timestamp'].dt.hour
+
+    # Mapping the day_of_week, season and weather_code columns
+    df['day_of_week'] = df['day_of_week'].map(days_of_week_map)
+    df['season_name'] = df['season'].map(seasons_map)
+    df['weather_description'] = df['weather_code'].map(weather_code_map)
+
+    # Renaming the specified columns
+    df.rename(columns={
+        "cnt": "count_of_new_bike_shares",
+        "t1": "real_temperature_C",
+        "t2": "feels_like_temperature_C",
+        "hum": "humidity_percentage"
+    }, inplace=True)
+
+    # Mapping month numbers to month names
+    df['month_name'] = df['month'].map(month_map)
+
+    # Creating a new feature that combines holidays and weekends
+    working_day, weekend, holiday = day_types
+    df['day_type'] = np.where(df['is_holiday'] == 1, holiday,
+                              np.where(df['is_weekend'] == 1, weekend, working_day))
+
+    # Calculating comfort_index from the normalized temperature, humidity and wind speed
+    # Weights as written by comfort_calibration.py
+    # (falls back to the hand-picked 0.8, 0.3 and 0.1 when no calibration has been run)
+    w1, w2, w3 = load_comfort_weights()
+    df['comfort_index'] = comfort_features(df) @ np.array([w1, w2, w3])
+
+    # Updating the weather_severity based on the specified conditions
+    df['weather_severity'] = df['weather_description'].apply(lambda x: 1 if x in severe_weather_conditions else 0)
+    return df
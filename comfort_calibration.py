@@ -0,0 +1,127 @@
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from bike_data import DATA_FILE, WEIGHTS_FILE, DEFAULT_WEIGHTS, load_data, engineer_features, comfort_features
+
+
+def weight_grid(step=0.05):
+    """Returns every non-negative weight combination in [0, 1]^3 on the given step, as a (k, 3) matrix.
+
+    The weights keep the sign of the hand-picked ones, so a higher comfort_index still means
+    more comfortable conditions. The Pearson correlation does not change when all weights are
+    scaled by the same positive factor, so only combinations whose largest weight is 1 are
+    needed. These lie on three faces of the cube, which are built directly: each weight in turn
+    is fixed to 1 and the other two take every value on the grid.
+    """
+    values = np.round(np.arange(0.0, 1.0 + step / 2, step), 10)
+    a, b = (axis.ravel() for axis in np.meshgrid(values, values))
+    faces = []
+    for fixed in range(3):
+        free = [axis for axis in range(3) if axis != fixed]
+        face = np.empty((len(a), 3))
+        face[:, fixed] = 1.0
+        face[:, free[0]] = a
+        face[:, free[1]] = b
+        faces.append(face)
+    # Edges are shared by two faces
+    return np.unique(np.vstack(faces), axis=0)
+
+
+def sufficient_statistics(X, y):
+    """Returns the feature covariance, the feature/target covariance and the target variance."""
+    Xc = X - X.mean(axis=0)
+    yc = y - y.mean()
+    return Xc.T @ Xc, Xc.T @ yc, yc @ yc
+
+
+def grid_correlations(weights, stats):
+    """Computes the correlation of X @ w with y for every row w of weights in one batch.
+
+    With the covariance matrices of the features, corr(X @ w, y) = w.c / sqrt(w'Sw * var_y),
+    so a candidate costs a handful of flops instead of a pass over the data.
+    """
+    feature_cov, target_cov, target_var = stats
+    numerator = weights @ target_cov
+    index_var = np.einsum('ij,jk,ik->i', weights, feature_cov, weights)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return numerator / np.sqrt(index_var * target_var)
+
+
+def calibrate(df, step=0.05, train=None):
+    """Evaluates the weight grid against count of bike shares, overall and per season.
+
+    Takes the engineered data, so the features are normalized exactly like the comfort_index
+    of the pipeline. train is a boolean row mask of the rows the weights are chosen on (all rows
+    by default). Returns a DataFrame with one row per candidate: the weights, the overall and
+    per-season correlation on the training rows and, when rows were held out, the correlation
+    on those rows. It is sorted by the overall training correlation, so the held-out column gives
+    an unbiased estimate for the chosen weights.
+    """
+    X = comfort_features(df)
+    y = df['count_of_new_bike_shares'].to_numpy(dtype=float)
+    train = np.ones(len(df), dtype=bool) if train is None else np.asarray(train, dtype=bool)
+    season = df['season_name'].to_numpy()
+    seasons = np.unique(season[train])
+
+    group_stats = [sufficient_statistics(X[train], y[train])]
+    group_stats += [sufficient_statistics(X[train & (season == s)], y[train & (season == s)]) for s in seasons]
+    if not train.all():
+        group_stats.append(sufficient_statistics(X[~train], y[~train]))
+
+    weights = weight_grid(step)
+    correlations = np.column_stack([grid_correlations(weights, stats) for stats in group_stats])
+
+    results = pd.DataFrame(weights, columns=['w1', 'w2', 'w3'])
+    results['overall'] = correlations[:, 0]
+    for i, s in enumerate(seasons, start=1):
+        results[f'season_{s}'] = correlations[:, i]
+    if not train.all():
+        results['holdout'] = correlations[:, -1]
+    return results.sort_values('overall', ascending=False).reset_index(drop=True)
+
+
+def save_comfort_weights(results, path=WEIGHTS_FILE):
+    """Writes the best-scoring weights, with their correlations, for the pipeline to use.
+
+    The weights are rescaled to the same total as the hand-picked ones, so the comfort_index
+    keeps its original range.
+    """
+    best = results.iloc[0]
+    scale = sum(DEFAULT_WEIGHTS) / best[['w1', 'w2', 'w3']].sum()
+    calibration = {
+        'weights': {name: round(float(best[name] * scale), 4) for name in ('w1', 'w2', 'w3')},
+        'correlation': {name: float(best[name]) for name in results.columns if name not in ('w1', 'w2', 'w3')}
+    }
+    with open(path, 'w') as f:
+        json.dump(calibration, f, indent=2)
+    return calibration
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Calibrate the comfort_index weights against bike shares.')
+    parser.add_argument('--data', default=DATA_FILE, help='raw hourly bike shares CSV')
+    parser.add_argument('--step', type=float, default=0.01, help='grid step for each weight')
+    parser.add_argument('--output', default=WEIGHTS_FILE, help='where to write the chosen weights')
+    parser.add_argument('--train-year', type=int, default=2015,
+                        help='year the weights are chosen on; the other years are held out to check them')
+    args = parser.parse_args()
+
+    # Going through the validated ingest, so quarantined rows are left out as in the pipeline
+    data, quarantined, _ = load_data(args.data)
+    data = engineer_features(data)
+    train = (data['year'] == args.train_year).to_numpy()
+    results = calibrate(data, step=args.step, train=train)
+    y = data['count_of_new_bike_shares'].to_numpy(dtype=float)
+    X = comfort_features(data)
+    baseline = [grid_correlations(np.array([DEFAULT_WEIGHTS]), sufficient_statistics(X[rows], y[rows]))[0]
+                for rows in (train, ~train)]
+    print(f"Skipped {len(quarantined)} quarantined rows")
+    print(f"Choosing the weights on {train.sum()} rows of {args.train_year}, checking them on {(~train).sum()} held-out rows")
+    print(f"Evaluated {len(results)} weight combinations")
+    print(f"Default weights {DEFAULT_WEIGHTS}: training correlation {baseline[0]:.4f}, held-out correlation {baseline[1]:.4f}")
+    print(results.head(10).to_string(index=False))
+    calibration = save_comfort_weights(results, args.output)
+    print(f"Wrote {calibration['weights']} to {args.output} (held-out correlation {calibration['correlation']['holdout']:.4f})")
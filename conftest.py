@@ -0,0 +1 @@
+# Makes the top-level modules of the study importable from the tests
@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+
+COMMUTE_HOURS = [7, 8, 9, 17, 18, 19]
+AFTERNOON_HOURS = [11, 12, 13, 14, 15, 16]
+
+
+def daily_profile_matrix(df, max_missing_hours=4):
+    """Pivots the hourly rows into one 24-dimension demand vector per day.
+
+    Returns the dates and a (days, 24) matrix of bike shares. Missing hours are filled with
+    the average of that hour over all days; days missing more than max_missing_hours hours
+    are dropped.
+    """
+    day_codes, dates = pd.factorize(df['timestamp'].dt.normalize(), sort=True)
+    hours = df['timestamp'].dt.hour.to_numpy()
+
+    profiles = np.full((len(dates), 24), np.nan)
+    profiles[day_codes, hours] = df['count_of_new_bike_shares'].to_numpy(dtype=float)
+
+    missing = np.isnan(profiles)
+    keep = missing.sum(axis=1) <= max_missing_hours
+    profiles = np.where(missing, np.nanmean(profiles, axis=0), profiles)[keep]
+    return pd.DatetimeIndex(dates)[keep], profiles
+
+
+def scale_profiles(profiles):
+    """Standardizes every hour of the day to zero mean and unit variance across days."""
+    std = profiles.std(axis=0)
+    return (profiles - profiles.mean(axis=0)) / np.where(std == 0, 1.0, std)
+
+
+def name_archetypes(centroids):
+    """Derives a readable archetype name for each centroid (in bike shares per hour).
+
+    A cluster is commute-peaked when its commute hours outweigh the early afternoon, and
+    leisure-afternoon otherwise. The names describe the shape and volume of the demand only.
+    They do not say what caused it, so a low-demand cluster is not called weather-suppressed.
+    """
+    totals = centroids.sum(axis=1)
+    commute = centroids[:, COMMUTE_HOURS].sum(axis=1)
+    afternoon = centroids[:, AFTERNOON_HOURS].sum(axis=1)
+    # An empty cluster has a zero centroid, and a cluster can have no afternoon demand
+    with np.errstate(divide='ignore', invalid='ignore'):
+        commute_ratio = np.where(afternoon > 0, commute / afternoon, np.where(commute > 0, np.inf, 0.0))
+    names = np.where(commute_ratio > 1.5, 'Commute-peaked', 'Leisure-afternoon').astype(object)
+    names[totals == 0] = 'No demand'
+
+    # Telling apart several clusters of the same pattern by their volume
+    for name in set(names):
+        members = np.flatnonzero(names == name)
+        if len(members) > 1 and name != 'No demand':
+            ranked = members[np.argsort(-totals[members])]
+            for rank, member in enumerate(ranked):
+                names[member] = f"{name} ({'high' if rank == 0 else 'moderate' if rank < len(ranked) - 1 else 'low'} demand)"
+    return list(names)
+
+
+def cluster_daily_profiles(df, n_clusters=4, batch_size=1024, random_state=42):
+    """Clusters the days into usage archetypes with mini-batch k-means.
+
+    Returns a DataFrame with one row per day (date, cluster, day_archetype, daily total of bike
+    shares) and a DataFrame of the average hourly profile of each archetype.
+    """
+    dates, profiles = daily_profile_matrix(df)
+    model = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, n_init=10, random_state=random_state)
+    clusters = model.fit_predict(scale_profiles(profiles))
+
+    # Centroids in bike shares, averaged from the member days rather than unscaled
+    counts = np.bincount(clusters, minlength=n_clusters)
+    centroids = np.zeros((n_clusters, 24))
+    np.add.at(centroids, clusters, profiles)
+    centroids /= np.maximum(counts, 1)[:, None]
+    names = name_archetypes(centroids)
+
+    assignments = pd.DataFrame({
+        'date': dates,
+        'cluster': clusters,
+        'day_archetype': np.array(names, dtype=object)[clusters],
+        'daily_bike_shares': profiles.sum(axis=1)
+    })
+    archetype_profiles = pd.DataFrame(centroids, columns=range(24))
+    archetype_profiles.insert(0, 'day_archetype', names)
+    archetype_profiles.insert(1, 'days', counts)
+    return assignments, archetype_profiles
@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+
+
+NUMERIC_COLUMNS = ['cnt', 't1', 't2', 'hum', 'wind_speed', 'weather_code', 'is_holiday', 'is_weekend', 'season']
+
+NS_PER_HOUR = 3600 * 10**9
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def parse_timestamps(values):
+    """Parses raw timestamps with the fixed format of the data; unparseable values become NaT."""
+    return pd.to_datetime(values, format=TIMESTAMP_FORMAT, errors='coerce')
+
+
+def coerce_numeric(chunk):
+    """Returns chunk with the numeric columns converted to numbers; bad values become NaN.
+
+    Only columns that were not read as numbers need converting, so a clean chunk is returned as is.
+    """
+    present = [column for column in NUMERIC_COLUMNS if column in chunk.columns]
+    non_numeric = chunk[present].select_dtypes(exclude='number').columns
+    if len(non_numeric) == 0:
+        return chunk
+    return chunk.assign(**{column: pd.to_numeric(chunk[column], errors='coerce') for column in non_numeric})
+
+
+class DataValidator:
+    """Checks raw hourly bike-share rows against the data-quality rules of the pipeline.
+
+    Every rule is evaluated in one vectorized pass over a chunk and returned as a boolean row
+    mask, so the bad rows can be quarantined with the same masks. The validator keeps the hours
+    it has already seen in a bitmap, which lets duplicate and missing hourly timestamps be found
+    across chunks during streaming ingest.
+    """
+
+    def __init__(self, weather_codes, seasons, humidity_range=(0, 100)):
+        self.weather_codes = np.asarray(list(weather_codes), dtype=float)
+        self.seasons = np.asarray(list(seasons), dtype=float)
+        self.humidity_range = humidity_range
+        self.rows_checked = 0
+        self.rule_counts = {}
+        self._origin = None
+        self._seen = np.zeros(0, dtype=bool)
+
+    def validate(self, chunk, timestamps=None):
+        """Returns a DataFrame of boolean masks, one column per rule, aligned with chunk.
+
+        timestamps can be the already parsed timestamp column, so it is only parsed once.
+        """
+        if timestamps is None:
+            timestamps = parse_timestamps(chunk['timestamp'])
+        numeric = coerce_numeric(chunk).reindex(columns=NUMERIC_COLUMNS).to_numpy(dtype=float)
+        cnt, hum, weather_code, season = (numeric[:, NUMERIC_COLUMNS.index(column)]
+                                          for column in ('cnt', 'hum', 'weather_code', 'season'))
+        invalid_timestamp = timestamps.isna().to_numpy()
+        ns = timestamps.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+
+        with np.errstate(invalid='ignore'):
+            masks = {
+                'invalid_timestamp': invalid_timestamp,
+                'off_hour_timestamp': ~invalid_timestamp & (ns % NS_PER_HOUR != 0),
+                'missing_value': np.isnan(numeric).any(axis=1),
+                'unknown_weather_code': ~np.isnan(weather_code) & ~np.isin(weather_code, self.weather_codes),
+                'unknown_season': ~np.isnan(season) & ~np.isin(season, self.seasons),
+                'negative_count': cnt < 0,
+                'humidity_out_of_range': (hum < self.humidity_range[0]) | (hum > self.humidity_range[1])
+            }
+
+        # Duplicates are checked last, so the first clean row of an hour is the one that is kept
+        candidates = ~np.logical_or.reduce(list(masks.values()))
+        masks['duplicate_timestamp'] = self._mark_seen(ns // NS_PER_HOUR, candidates)
+
+        self.rows_checked += len(chunk)
+        for rule, mask in masks.items():
+            self.rule_counts[rule] = self.rule_counts.get(rule, 0) + int(mask.sum())
+        return pd.DataFrame(np.column_stack(list(masks.values())), columns=list(masks), index=chunk.index)
+
+    def missing_timestamps(self):
+        """Returns the hours between the first and last seen timestamp that have no clean row."""
+        seen = np.flatnonzero(self._seen)
+        if len(seen) == 0:
+            return pd.DatetimeIndex([])
+        missing = np.flatnonzero(~self._seen[seen[0]:seen[-1] + 1]) + seen[0] + self._origin
+        return pd.DatetimeIndex((missing * NS_PER_HOUR).astype('datetime64[ns]'))
+
+    def summary(self):
+        """Returns the number of rows (or hours, for missing timestamps) that failed each rule."""
+        counts = dict(self.rule_counts)
+        counts['missing_hourly_timestamp'] = len(self.missing_timestamps())
+        report = pd.DataFrame({'rule': list(counts), 'rows': list(counts.values())})
+        report['share_percentage'] = 100.0 * report['rows'] / max(self.rows_checked, 1)
+        return report
+
+    def _mark_seen(self, hours, candidates):
+        duplicates = np.zeros(len(hours), dtype=bool)
+        if not candidates.any():
+            return duplicates
+        hours = hours[candidates]
+
+        # Growing the bitmap so that it covers every hour of this chunk
+        if self._origin is None:
+            self._origin = hours.min()
+        if hours.min() < self._origin:
+            self._seen = np.concatenate([np.zeros(self._origin - hours.min(), dtype=bool), self._seen])
+            self._origin = hours.min()
+        offsets = hours - self._origin
+        if offsets.max() >= len(self._seen):
+            self._seen = np.concatenate([self._seen, np.zeros(offsets.max() + 1 - len(self._seen), dtype=bool)])
+
+        duplicates[candidates] = self._seen[offsets] | pd.Series(offsets).duplicated().to_numpy()
+        self._seen[offsets] = True
+        return duplicates
+
+
+def load_validated_csv(path, weather_codes, seasons, chunksize=None):
+    """Reads a raw CSV, validating each chunk as it is read.
+
+    Returns the clean rows, with the timestamp column parsed and the numeric columns converted
+    to numbers, the quarantined rows (raw, with a 'failed_rules' column naming the rules they
+    broke) and the validator holding the report.
+    """
+    validator = DataValidator(weather_codes, seasons)
+    chunks = pd.read_csv(path, chunksize=chunksize) if chunksize else [pd.read_csv(path)]
+    clean, quarantined = [], []
+    for chunk in chunks:
+        timestamps = parse_timestamps(chunk['timestamp'])
+        converted = coerce_numeric(chunk).assign(timestamp=timestamps)
+        masks = validator.validate(converted, timestamps)
+        bad = masks.to_numpy().any(axis=1)
+        if not bad.any():
+            clean.append(converted)
+            continue
+        clean.append(converted[~bad])
+        failed_rules = masks[bad].dot(masks.columns + ', ').str.rstrip(', ')
+        quarantined.append(chunk[bad].assign(failed_rules=failed_rules))
+    if not quarantined:
+        quarantined.append(pd.DataFrame(columns=[*chunk.columns, 'failed_rules']))
+    return pd.concat(clean, ignore_index=True), pd.concat(quarantined, ignore_index=True), validator
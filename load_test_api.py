@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import time
+
+
+ROUTES = ['/aggregates/hourly', '/aggregates/day_type', '/aggregates/season',
+          '/aggregates/hourly_day_type', '/statistical_tests', '/correlation']
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, headers.get('etag')
+
+
+async def client(host, port, requests, revalidate, statuses):
+    # One keep-alive connection sending requests one after another, cycling over the routes
+    reader, writer = await asyncio.open_connection(host, port)
+    etags = {}
+    for i in range(requests):
+        route = ROUTES[i % len(ROUTES)]
+        headers = f"GET {route} HTTP/1.1\r\nHost: {host}\r\n"
+        if revalidate and route in etags:
+            headers += f"If-None-Match: {etags[route]}\r\n"
+        writer.write((headers + "\r\n").encode())
+        status, etag = await read_response(reader)
+        etags[route] = etag
+        statuses[status] = statuses.get(status, 0) + 1
+    writer.close()
+
+
+async def main(host, port, clients, requests, revalidate):
+    statuses = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, revalidate, statuses) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    total = clients * requests
+    print(f"{total} requests from {clients} concurrent clients in {elapsed:.2f}s")
+    print(f"Throughput: {total / elapsed:.0f} requests/sec")
+    print(f"Status codes: {statuses}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the requests/sec of the aggregate API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--clients', type=int, default=50, help='concurrent keep-alive connections')
+    parser.add_argument('--requests', type=int, default=200, help='requests per connection')
+    parser.add_argument('--revalidate', action='store_true', help='send If-None-Match with the last ETag of each route')
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.clients, args.requests, args.revalidate))
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from aggregates import bike_share_aggregates, correlation_matrix
+from bike_data import load_data, engineer_features
+from data_validation import load_validated_csv
+
+
+RAW_CSV = """timestamp,cnt,t1,t2,hum,wind_speed,weather_code,is_holiday,is_weekend,season
+2015-01-04 00:00:00,182,3.0,2.0,93.0,6.0,3.0,0.0,1.0,3.0
+2015-01-04 01:00:00,abc,3.0,2.5,93.0,5.0,1.0,0.0,1.0,3.0
+2015-01-04 02:00:00,134,2.5,2.5,96.5,0.0,1.0,0.0,1.0,3.0
+2015-01-04 03:00:00,72,2.0,2.0,130.0,0.0,1.0,0.0,1.0,3.0
+2015-01-04 04:00:00,47,2.0,0.0,93.0,6.5,5.0,0.0,1.0,3.0
+2015-01-04 05:00:00,46,2.0,2.0,93.0,4.0,1.0,0.0,1.0,3.0
+2015-01-04 05:00:00,51,1.0,-1.0,100.0,7.0,4.0,0.0,1.0,3.0
+2015-01-04 07:00:00,94,1.0,-1.0,100.0,7.0,4.0,0.0,1.0,3.0
+"""
+
+WEATHER_CODES = [1, 2, 3, 4, 7, 10, 26, 94]
+SEASONS = [0, 1, 2, 3]
+
+
+def write_raw_csv(tmp_path):
+    path = tmp_path / 'bikes.csv'
+    path.write_text(RAW_CSV)
+    return path
+
+
+def test_bad_rows_are_quarantined_with_their_rules(tmp_path):
+    clean, quarantined, validator = load_validated_csv(write_raw_csv(tmp_path), WEATHER_CODES, SEASONS)
+
+    assert len(clean) == 4
+    assert quarantined['failed_rules'].tolist() == ['missing_value', 'humidity_out_of_range',
+                                                    'unknown_weather_code', 'duplicate_timestamp']
+    # Quarantined rows keep their raw values
+    assert quarantined['cnt'].iloc[0] == 'abc'
+    # Hours without a clean row, including the quarantined ones
+    assert validator.missing_timestamps().tolist() == [pd.Timestamp(f'2015-01-04 0{hour}:00:00') for hour in (1, 3, 4, 6)]
+
+
+def test_clean_rows_are_numeric_after_a_bad_value(tmp_path):
+    for chunksize in (None, 3):
+        clean, _, _ = load_validated_csv(write_raw_csv(tmp_path), WEATHER_CODES, SEASONS, chunksize=chunksize)
+        assert pd.api.types.is_numeric_dtype(clean['cnt'])
+        assert pd.api.types.is_datetime64_any_dtype(clean['timestamp'])
+
+
+def test_aggregates_survive_a_bad_value(tmp_path):
+    df, _, _ = load_data(write_raw_csv(tmp_path))
+    df = engineer_features(df)
+
+    hourly = bike_share_aggregates(df, 'hour')
+    assert hourly['total_bike_shares'].sum() == 182 + 134 + 46 + 94
+    assert 'count_of_new_bike_shares' in correlation_matrix(df).columns